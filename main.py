@@ -3,71 +3,295 @@ import base64
 from io import BytesIO
 import json
 import traceback
-from flask import Flask, request, jsonify
+import threading
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from flask import Flask, Response, request, jsonify
+import orjson
 from PIL import Image
 import vertexai
-from vertexai.preview.vision_models import ImageGenerationModel
 import random
 
 
 # Flaskアプリケーションの初期化
 app = Flask(__name__)
 
+def orjson_response(obj, status=200, headers=None):
+    # base64を含む大きなJSONはorjsonで直接bytesにシリアライズして返す（jsonifyより高速）
+    return Response(orjson.dumps(obj), status=status, headers=headers, mimetype="application/json")
+
 # Vertex AI初期化
 ENV_VARS = {
     "PROJECT_ID": os.getenv("PROJECT_ID"),
-    "LOCATION": os.getenv("REGION", "us-central1")
+    "LOCATION": os.getenv("REGION", "us-central1"),
+    # 生成結果キャッシュの最大件数（1件あたり画像1枚につき最大約1.4MBのbase64を保持する）
+    "RESPONSE_CACHE_SIZE": int(os.getenv("RESPONSE_CACHE_SIZE", "32")),
+    "RESPONSE_CACHE_TTL": int(os.getenv("RESPONSE_CACHE_TTL", "3600"))
 }
 vertexai.init(project=ENV_VARS["PROJECT_ID"], location=ENV_VARS["LOCATION"])
 
-def compress_image(pil_image, max_size=1024 * 1024, max_pixels=1_000_000):
-    # 画像サイズをチェックしながらJPEGで圧縮、必要に応じて画像を縮小
+# 使用するImagenモデル
+MODEL_VERSION = "imagen-4.0-generate-001"
+
+# 1リクエストで生成できる画像の最大枚数（Imagenの上限）
+MAX_NUMBER_OF_IMAGES = 4
+
+# モデルインスタンスはリクエストごとに生成せず、プロセス内で使い回す
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+# /debug系エンドポイント用のイントロスペクション結果のキャッシュ
+_DEBUG_CACHE = {}
+_DEBUG_CACHE_LOCK = threading.Lock()
+
+def get_model():
+    # 初回呼び出し時のみモデルを初期化（複数スレッドから同時に呼ばれても一度だけ）
+    # vision_modelsのインポートは重いため、モデルが必要になるまで遅延させる
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                from vertexai.preview.vision_models import ImageGenerationModel
+                _MODEL = ImageGenerationModel.from_pretrained(MODEL_VERSION)
+    return _MODEL
+
+def _build_debug_info(model):
+    # inspectは/debug系でしか使わないため、ここでインポートする
+    import inspect
+
+    # generate_imagesのシグネチャとパラメータ情報を取得
+    method_signature = inspect.signature(model.generate_images)
+    params_info = {}
+    for param_name, param in method_signature.parameters.items():
+        params_info[param_name] = {
+            "name": param_name,
+            "default": str(param.default) if param.default is not inspect.Parameter.empty else "必須",
+            "kind": str(param.kind),
+            "annotation": str(param.annotation) if param.annotation is not inspect.Parameter.empty else "不明"
+        }
+
+    # ソースコードの位置を取得（可能な場合）
+    try:
+        source_info = inspect.getfile(model.__class__)
+    except:
+        source_info = "取得不可"
+
+    # クラスのメソッド一覧を取得
+    methods = {}
+    for method_name in dir(model):
+        if not method_name.startswith("_"):  # 非プライベートメソッドのみ
+            method = getattr(model, method_name)
+            if callable(method):
+                try:
+                    methods[method_name] = {
+                        "signature": str(inspect.signature(method)),
+                        "doc": inspect.getdoc(method) or "ドキュメントなし"
+                    }
+                except:
+                    methods[method_name] = {"error": "シグネチャ取得不可"}
+
+    # クラスの属性を取得
+    attributes = {}
+    for attr_name in dir(model):
+        if not attr_name.startswith("_") and attr_name not in methods:
+            try:
+                attr_value = getattr(model, attr_name)
+                attributes[attr_name] = str(type(attr_value))
+            except:
+                attributes[attr_name] = "取得不可"
+
+    return {
+        "method_signature": str(method_signature),
+        "parameters": params_info,
+        "docstring": model.generate_images.__doc__ or "ドキュメント文字列なし",
+        "module_info": {
+            "module_name": model.__class__.__module__,
+            "model_class": model.__class__.__name__
+        },
+        "source_location": source_info,
+        "class_name": model.__class__.__name__,
+        "methods": methods,
+        "attributes": attributes
+    }
+
+def get_debug_info():
+    # イントロスペクションは重いため、一度だけ計算してキャッシュ
+    if not _DEBUG_CACHE:
+        with _DEBUG_CACHE_LOCK:
+            if not _DEBUG_CACHE:
+                _DEBUG_CACHE.update(_build_debug_info(get_model()))
+    return _DEBUG_CACHE
+
+# PROJECT_IDが設定されている場合は起動時にモデルを初期化しておく
+# （デバッグ情報は/debug系の初回アクセス時に計算する）
+if ENV_VARS["PROJECT_ID"]:
+    try:
+        get_model()
+    except Exception:
+        print(f"モデル初期化エラー（初回リクエスト時に再試行します）: {traceback.format_exc()}", flush=True)
+
+# 出力画像フォーマットとMIMEタイプの対応
+IMAGE_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp"
+}
+DEFAULT_IMAGE_FORMAT = "JPEG"
+
+# エンコード用バッファはスレッドごとに確保して使い回す
+# truncateすると確保済みの領域が解放されるため、先頭から上書きして書き込んだバイト数で管理する
+_ENCODE_BUFFER_RESERVE = 2 * 1024 * 1024
+_THREAD_LOCAL = threading.local()
+
+def _get_encode_buffer():
+    # 現在のスレッド用のバッファを取得（初回のみ2MB確保）
+    buffer = getattr(_THREAD_LOCAL, "buffer", None)
+    if buffer is None:
+        buffer = BytesIO(bytes(_ENCODE_BUFFER_RESERVE))
+        _THREAD_LOCAL.buffer = buffer
+    return buffer
+
+def _read_encoded(buffer, size, encode_base64=False):
+    # バッファ先頭からsizeバイト分（直前のエンコード結果）を取り出す
+    # base64の場合はバッファのビューから直接エンコードし、中間のbytesコピーを作らない
+    with buffer.getbuffer() as view:
+        if encode_base64:
+            return base64.b64encode(view[:size]).decode("ascii")
+        return bytes(view[:size])
+
+def _encode_image(pil_image, buffer, quality, image_format=DEFAULT_IMAGE_FORMAT):
+    # バッファの先頭から指定フォーマットで上書き保存し、保存後のバイト数を返す
+    buffer.seek(0)
+    # Pillowの既定のエンコード設定（JPEGはベースライン・4:2:0、WebPはmethod=4）で保存
+    pil_image.save(buffer, format=image_format, quality=quality)
+    return buffer.tell()
+
+def _search_quality(pil_image, buffer, max_size, min_quality, max_quality, image_format, step=5):
+    # max_size以下に収まる最も高いクオリティを二分探索で探す（step刻み）
+    # 収まった場合は圧縮後のバイト列、収まらない場合はNoneと最後に計測したサイズを返す
+    qualities = list(range(min_quality, max_quality + 1, step))
+    lo, hi = 0, len(qualities) - 1
+    best_bytes = None
+    size = None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        size = _encode_image(pil_image, buffer, qualities[mid], image_format)
+        if size <= max_size:
+            best_bytes = _read_encoded(buffer, size)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    return best_bytes, size
+
+# 画像圧縮用のスレッドプール（PILのエンコード・リサイズはGILを解放するため並列化が有効）
+# リクエストごとのスレッド生成を避けるためモジュールで共有する
+_COMPRESS_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_NUMBER_OF_IMAGES)
+
+def compress_image(
+    pil_image,
+    max_size=1024 * 1024,
+    max_pixels=1_000_000,
+    image_format=DEFAULT_IMAGE_FORMAT,
+    encode_base64=False
+):
+    # 画像サイズをチェックしながら指定フォーマット（JPEGまたはWebP）で圧縮、必要に応じて画像を縮小
+    # encode_base64=Trueの場合はbase64文字列、それ以外はバイト列を返す
     quality = 50
-    buffer = BytesIO()
+    buffer = _get_encode_buffer()
+    source_image = pil_image  # リサイズは常に元画像から行い、劣化の累積を防ぐ
     width, height = pil_image.size
 
-    # まず、画像の総ピクセル数が100万を超えている場合、縮小します
+    # 小さい画像は高めのクオリティで一度だけ試し、収まればそのまま返す
     total_pixels = width * height
+    if total_pixels <= max_pixels // 4:
+        size = _encode_image(pil_image, buffer, 75, image_format)
+        if size <= max_size:
+            return _read_encoded(buffer, size, encode_base64)
+
+    # まず、画像の総ピクセル数が100万を超えている場合、縮小します
     if total_pixels > max_pixels:
         scale_factor = (max_pixels / total_pixels) ** 0.5  # 縮小比率を計算
-        new_width = int(width * scale_factor)
-        new_height = int(height * scale_factor)
+        width = int(width * scale_factor)
+        height = int(height * scale_factor)
         
-        # どのバージョンのPillowでも動作するリサイズ方法
-        pil_image = pil_image.resize((new_width, new_height), Image.LANCZOS)
+        # 元画像が未デコードのJPEGの場合、libjpegのDCTスケーリング（1/2・1/4・1/8）で
+        # 目標サイズ以上の範囲で縮小しながらデコードし、リサイズ対象の画素数を減らす
+        if pil_image.format == "JPEG":
+            pil_image.draft("RGB", (width, height))
         
-    # 圧縮とリサイズを繰り返し、指定サイズ以下になるまで試行
+        # どのバージョンのPillowでも動作するリサイズ方法
+        pil_image = source_image.resize((width, height), Image.LANCZOS)
+
+    # 一度だけ試し圧縮して現在のサイズを確認
+    size = _encode_image(pil_image, buffer, quality, image_format)
+    if size <= max_size:
+        return _read_encoded(buffer, size, encode_base64)  # 目標サイズに収まった場合
+
     while True:
-        buffer.seek(0)
-        buffer.truncate()
+        # クオリティを二分探索し、収まる最も高いクオリティで圧縮
+        image_bytes, size = _search_quality(pil_image, buffer, max_size, 10, quality - 5, image_format)
+        if image_bytes is not None:
+            # 探索中にバッファが上書きされるため、最良の結果はbytesとして保持している
+            if encode_base64:
+                return base64.b64encode(image_bytes).decode("ascii")
+            return image_bytes
 
-        # 現在のサイズを確認
-        pil_image.save(buffer, format="JPEG", quality=quality)
-        size = buffer.tell()
+        # クオリティ10でも収まらない場合のみ、必要な縮小率を一度で計算してリサイズ
+        # （圧縮後のサイズは画素数にほぼ比例する）
+        scale = (max_size / size) ** 0.5 * 0.95
+        new_width = max(1, int(width * scale))
+        new_height = max(1, int(height * scale))
+        if (new_width, new_height) == (width, height):
+            # これ以上縮小できない場合は目標サイズに収められないためエラー
+            raise ValueError(
+                f"画像を{max_size}バイト以下に圧縮できません（{width}x{height}、クオリティ10で{size}バイト）"
+            )
+        width, height = new_width, new_height
+        pil_image = source_image.resize((width, height), Image.LANCZOS)
 
+        size = _encode_image(pil_image, buffer, quality, image_format)
         if size <= max_size:
-            break  # 目標サイズに収まった場合
+            return _read_encoded(buffer, size, encode_base64)
 
-        # サイズが大きい場合、クオリティを下げてリサイズ
-        quality -= 5
-        if quality < 10:  # クオリティが極端に低くならないように制限
-            quality = 10
+# 同一パラメータ（seed指定あり）の生成結果をプロセス内にLRU＋TTLでキャッシュ
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
 
-        # 解像度がまだ大きい場合はさらに縮小
-        width, height = pil_image.size
-        width = int(width * 0.9)
-        height = int(height * 0.9)
-        
-        # どのバージョンのPillowでも動作するリサイズ方法
-        pil_image = pil_image.resize((width, height))
+def _response_cache_key(*params):
+    # パラメータをJSON配列にしてからハッシュ化（区切り文字の衝突を避ける）
+    return hashlib.sha1(json.dumps(params, ensure_ascii=False).encode("utf-8")).digest()
+
+def _get_cached_response(key):
+    # 有効期限内のキャッシュがあれば返し、LRUの順序を更新
+    with _RESPONSE_CACHE_LOCK:
+        entry = _RESPONSE_CACHE.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > ENV_VARS["RESPONSE_CACHE_TTL"]:
+            del _RESPONSE_CACHE[key]
+            return None
+        _RESPONSE_CACHE.move_to_end(key)
+        return value
 
-    return buffer.getvalue()
+def _put_cached_response(key, value):
+    # キャッシュに追加し、上限を超えた分は古いものから削除
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = (time.monotonic(), value)
+        _RESPONSE_CACHE.move_to_end(key)
+        while len(_RESPONSE_CACHE) > ENV_VARS["RESPONSE_CACHE_SIZE"]:
+            _RESPONSE_CACHE.popitem(last=False)
 
 def imagen_generate(
     prompt, 
     negative_prompt="", 
     seed=None, 
-    aspect_ratio="1:1"
+    aspect_ratio="1:1",
+    image_format=DEFAULT_IMAGE_FORMAT,
+    encode_base64=True,
+    number_of_images=1
 ):
     try:
         # seedがNoneの場合、Uint32の範囲で乱数を生成
@@ -77,14 +301,28 @@ def imagen_generate(
             generated_seed = random.randint(0, 2**32-1)
             seed = generated_seed  # 生成した乱数をseedとして使用
         
-        # Vertex AIのImagen モデルを初期化
-        model = ImageGenerationModel.from_pretrained("imagen-4.0-generate-001")
-        model_version = "imagen-4.0-generate-001"
+        # seedが指定されている場合は結果が決まるため、キャッシュを確認
+        # （seed未指定の場合は毎回異なる画像を返すべきなのでキャッシュしない）
+        cache_key = None
+        if generated_seed is None and ENV_VARS["RESPONSE_CACHE_SIZE"] > 0:
+            cache_key = _response_cache_key(
+                prompt, negative_prompt, seed, aspect_ratio, image_format, encode_base64,
+                number_of_images
+            )
+            cached = _get_cached_response(cache_key)
+            if cached is not None:
+                cached_images, cached_model_version, cached_raw_response = cached
+                raw_response = dict(cached_raw_response, cache_hit=True)
+                return list(cached_images), None, cached_model_version, raw_response, seed
+        
+        # キャッシュ済みのImagen モデルを取得
+        model = get_model()
+        model_version = MODEL_VERSION
         
         # 画像生成リクエスト（生成したseedを使用）
         generate_response = model.generate_images(
             prompt=prompt,
-            number_of_images=1,
+            number_of_images=number_of_images,
             negative_prompt=negative_prompt,
             aspect_ratio=aspect_ratio,
             add_watermark=False,
@@ -104,19 +342,20 @@ def imagen_generate(
         except Exception as e:
             raw_response = {"error": f"生レスポンス取得エラー: {str(e)}"}
         
-        image_list = []
-        for index, result in enumerate(generate_response):
-            # PIL Imageオブジェクトを取得
-            pil_image = generate_response[index]._pil_image
-
-            # 画像を圧縮してバイト列を取得
-            compressed_image_bytes = compress_image(pil_image)
+        # PIL Imageオブジェクトを取得
+        pil_images = [result._pil_image for result in generate_response]
 
-            # base64エンコード
-            img_str = base64.b64encode(compressed_image_bytes).decode("utf-8")
+        # 画像を圧縮し、base64文字列（バイナリ返却時はバイト列）を取得
+        # 複数枚の場合はスレッドプールで並列に圧縮（結果の順序は維持される）
+        compress = partial(compress_image, image_format=image_format, encode_base64=encode_base64)
+        if len(pil_images) > 1:
+            image_list = list(_COMPRESS_EXECUTOR.map(compress, pil_images))
+        else:
+            image_list = [compress(pil_image) for pil_image in pil_images]
 
-            # エンコードされた画像をリストに追加
-            image_list.append(img_str)
+        # 生成結果をキャッシュ（呼び出し側で変更されないようタプルで保持）
+        if cache_key is not None:
+            _put_cached_response(cache_key, (tuple(image_list), model_version, raw_response))
 
         # 実際に使用したseed値（自動生成または指定値）を返す
         return image_list, None, model_version, raw_response, seed
@@ -133,26 +372,70 @@ def generate():
         
         # バリデーション
         if not data or "prompt" not in data or not data["prompt"]:
-            return jsonify({"error": "プロンプトは必須です"}), 400
+            return orjson_response({"error": "プロンプトは必須です"}, 400)
             
         prompt = data["prompt"]
         negative_prompt = data.get("negative_prompt", "")
         seed = data.get("seed", None)  # ユーザーからのseedがない場合はNone
         aspect_ratio = data.get("aspect_ratio", "3:4")
+        number_of_images = data.get("number_of_images", 1)
+        
+        # 生成枚数は1〜MAX_NUMBER_OF_IMAGESの整数のみ受け付ける
+        if (
+            not isinstance(number_of_images, int)
+            or isinstance(number_of_images, bool)
+            or not 1 <= number_of_images <= MAX_NUMBER_OF_IMAGES
+        ):
+            return orjson_response(
+                {"error": f"number_of_imagesは1〜{MAX_NUMBER_OF_IMAGES}の整数で指定してください"}, 400
+            )
+        
+        # 出力フォーマットを決定（AcceptヘッダーにWebPが明示されている場合のみWebP）
+        # WebPはエンコードのCPU負荷が高いため、*/* などのワイルドカードでは既定のJPEGとする
+        image_format = DEFAULT_IMAGE_FORMAT
+        if any(mimetype == "image/webp" and q > 0 for mimetype, q in request.accept_mimetypes):
+            image_format = "WEBP"
+        
+        # ?format=binary の場合はbase64/JSONを使わず画像バイナリをそのまま返す
+        binary_response = request.args.get("format") == "binary"
+        if binary_response and number_of_images > 1:
+            return orjson_response({"error": "format=binaryの場合、number_of_imagesは1のみ指定できます"}, 400)
         
         # 画像生成（修正版関数を呼び出し）
         images, error, model_version, raw_response, used_seed = imagen_generate(
-            prompt, negative_prompt, seed, aspect_ratio
+            prompt, negative_prompt, seed, aspect_ratio, image_format,
+            encode_base64=not binary_response,
+            number_of_images=number_of_images
         )
         
         if error:
-            return jsonify({"error": error}), 500
+            return orjson_response({"error": error}, 500)
+        
+        if binary_response:
+            # 安全フィルタでブロックされた場合は画像が0枚になるため、返す画像がない旨を返却
+            if not images:
+                return orjson_response({
+                    "error": "画像が生成されませんでした（安全フィルタでブロックされた可能性があります）",
+                    "seed": used_seed
+                }, 422)
+            
+            # バイナリ返却時は1枚のみ生成するため、先頭の画像を返す（メタデータはヘッダーで返却）
+            return Response(
+                images[0],
+                mimetype=IMAGE_MIME_TYPES[image_format],
+                headers={
+                    "X-Seed": str(used_seed),
+                    "X-Model-Version": model_version,
+                    "Vary": "Accept"  # Acceptヘッダーで画像フォーマットが変わるため
+                }
+            )
             
         # 結果を返却（使用したseed値を含む）
-        return jsonify({
+        return orjson_response({
             "status": "success",
             "data": {
                 "images": images,
+                "mime_type": IMAGE_MIME_TYPES[image_format],
                 "prompt": prompt,
                 "negative_prompt": negative_prompt,
                 "seed": used_seed,  # 実際に使用したseed値（自動生成または指定値）
@@ -160,12 +443,12 @@ def generate():
                 "model_version": model_version,
                 "raw_response": raw_response
             }
-        })
+        }, headers={"Vary": "Accept"})  # Acceptヘッダーで画像フォーマットが変わるため
         
     except Exception as e:
         error_details = traceback.format_exc()
         print(f"エラー詳細: {error_details}", flush=True)
-        return jsonify({"error": str(e), "details": error_details}), 500
+        return orjson_response({"error": str(e), "details": error_details}, 500)
 
 @app.route("/", methods=["GET"])
 def health_check():
@@ -175,16 +458,10 @@ def health_check():
 def debug():
     try:
         # Vertex AIのバージョン情報
-        import vertexai
         vertexai_version = getattr(vertexai, "__version__", "不明")
         
-        # ImageGenerationModelの情報
-        from vertexai.preview.vision_models import ImageGenerationModel
-        model = ImageGenerationModel.from_pretrained("imagen-4.0-generate-001")
-        
-        # メソッドのシグネチャを調査
-        import inspect
-        method_signature = str(inspect.signature(model.generate_images))
+        # メソッドのシグネチャを調査（キャッシュ済み）
+        method_signature = get_debug_info()["method_signature"]
         
         return jsonify({
             "status": "success",
@@ -200,48 +477,19 @@ def debug():
 def debug_params():
     try:
         # Vertex AIのバージョン情報
-        import inspect
         vertexai_version = getattr(vertexai, "__version__", "不明")
         
-        # ImageGenerationModelの初期化
-        model = ImageGenerationModel.from_pretrained("imagen-4.0-generate")
-        
-        # generate_imagesメソッドのシグネチャを取得
-        method_signature = inspect.signature(model.generate_images)
-        
-        # パラメータ情報を取得
-        params_info = {}
-        for param_name, param in method_signature.parameters.items():
-            params_info[param_name] = {
-                "name": param_name,
-                "default": str(param.default) if param.default is not inspect.Parameter.empty else "必須",
-                "kind": str(param.kind),
-                "annotation": str(param.annotation) if param.annotation is not inspect.Parameter.empty else "不明"
-            }
-        
-        # docstringからパラメータ情報を抽出
-        docstring = model.generate_images.__doc__ or "ドキュメント文字列なし"
-        
-        # モジュール情報の取得
-        module_info = {
-            "module_name": model.__class__.__module__,
-            "model_class": model.__class__.__name__
-        }
-        
-        # ソースコードの位置を取得（可能な場合）
-        try:
-            source_info = inspect.getfile(model.__class__)
-        except:
-            source_info = "取得不可"
+        # シグネチャ・パラメータ・docstring等はキャッシュ済みの情報を使用
+        debug_info = get_debug_info()
         
         return jsonify({
             "status": "success",
             "vertexai_version": vertexai_version,
-            "method_signature": str(method_signature),
-            "parameters": params_info,
-            "docstring": docstring,
-            "module_info": module_info,
-            "source_location": source_info
+            "method_signature": debug_info["method_signature"],
+            "parameters": debug_info["parameters"],
+            "docstring": debug_info["docstring"],
+            "module_info": debug_info["module_info"],
+            "source_location": debug_info["source_location"]
         })
     except Exception as e:
         error_details = traceback.format_exc()
@@ -254,38 +502,14 @@ def debug_params():
 @app.route("/debug/model", methods=["GET"])
 def debug_model():
     try:
-        # モデルのインスタンス化
-        model = ImageGenerationModel.from_pretrained("imagen-4.0-generate-001")
-        
-        # クラスのメソッド一覧を取得
-        methods = {}
-        for method_name in dir(model):
-            if not method_name.startswith("_"):  # 非プライベートメソッドのみ
-                method = getattr(model, method_name)
-                if callable(method):
-                    try:
-                        methods[method_name] = {
-                            "signature": str(inspect.signature(method)),
-                            "doc": inspect.getdoc(method) or "ドキュメントなし"
-                        }
-                    except:
-                        methods[method_name] = {"error": "シグネチャ取得不可"}
-        
-        # クラスの属性を取得
-        attributes = {}
-        for attr_name in dir(model):
-            if not attr_name.startswith("_") and attr_name not in methods:
-                try:
-                    attr_value = getattr(model, attr_name)
-                    attributes[attr_name] = str(type(attr_value))
-                except:
-                    attributes[attr_name] = "取得不可"
+        # メソッド一覧・属性はキャッシュ済みの情報を使用
+        debug_info = get_debug_info()
         
         return jsonify({
             "status": "success",
-            "class_name": model.__class__.__name__,
-            "methods": methods,
-            "attributes": attributes
+            "class_name": debug_info["class_name"],
+            "methods": debug_info["methods"],
+            "attributes": debug_info["attributes"]
         })
     except Exception as e:
         error_details = traceback.format_exc()
@@ -304,8 +528,8 @@ def test_param():
         param_name = data.get("param_name")
         param_value = data.get("param_value")
         
-        # モデルをインスタンス化
-        model = ImageGenerationModel.from_pretrained("imagen-4.0-generate-001")
+        # キャッシュ済みのモデルを取得
+        model = get_model()
         
         # 基本パラメータ
         params = {
@@ -347,6 +571,7 @@ def test_param():
 
 
 if __name__ == "__main__":
+    # ローカル開発用（コンテナではgunicornで起動する）
     # 環境変数PORTを明示的に取得
     port = int(os.environ.get('PORT', 8080))
     # ホストは必ず'0.0.0.0'に設定